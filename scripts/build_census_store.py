@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+import csv
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from census_store import column_file, postcodes_file, schema_file, store_dir
+
+# Get the project root directory (parent of scripts/)
+project_root = Path(__file__).parent.parent
+
+census_dir = project_root / 'data/raw/2021_GCP_POA_for_NSW_short-header/2021 Census GCP Postal Areas for NSW'
+
+# GCP tables to ingest. G01 must stay first: it lists every postal area and sets the row order.
+# Add a table here to make its columns available to downstream scripts.
+tables = [
+    'G01',   # Selected person characteristics (totals, broad age bands, dwelling location)
+    'G04A',  # Age by sex, 0-49
+    'G04B',  # Age by sex, 50+
+]
+
+
+def table_file(table):
+    return census_dir / f"2021Census_{table}_NSW_POA.csv"
+
+
+def fingerprint(path):
+    """Size and mtime of a source CSV, used to skip tables that haven't changed."""
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+
+def strip_poa(code):
+    # Remove 'POA' prefix if present (e.g., 'POA2000' -> '2000')
+    return code[3:] if code.startswith('POA') else code
+
+
+def to_array(values):
+    """Type a column of CSV strings as int64 if possible, otherwise float64 (missing -> NaN)."""
+    if all(value not in (None, '') for value in values):
+        try:
+            return np.array([int(value) for value in values], dtype=np.int64)
+        except ValueError:
+            pass
+    return np.array([float(value) if value not in (None, '') else np.nan for value in values], dtype=np.float64)
+
+
+def ingest_table(table, row_index):
+    """Parse one GCP CSV in a single pass and write each column as an .npy aligned to row_index."""
+    with open(table_file(table), 'r') as f:
+        reader = csv.DictReader(f)
+        columns = [name for name in reader.fieldnames if name != 'POA_CODE_2021']
+        values = {name: [None] * len(row_index) for name in columns}
+        for row in reader:
+            i = row_index.get(strip_poa(row['POA_CODE_2021']))
+            if i is None:
+                continue
+            for name in columns:
+                values[name][i] = row[name]
+
+    table_dir = store_dir / table
+    if table_dir.exists():
+        shutil.rmtree(table_dir)
+    table_dir.mkdir(parents=True)
+
+    dtypes = {}
+    for name in columns:
+        array = to_array(values[name])
+        np.save(column_file(f"{table}.{name}"), array)
+        dtypes[f"{table}.{name}"] = str(array.dtype)
+    return dtypes
+
+
+if __name__ == '__main__':
+    store_dir.mkdir(parents=True, exist_ok=True)
+
+    schema = {'tables': {}, 'columns': {}}
+    if schema_file.exists():
+        with open(schema_file, 'r') as f:
+            schema = json.load(f)
+
+    # The postcode index comes from G01; if it changes, every table has to be realigned
+    g01_fingerprint = fingerprint(table_file('G01'))
+    if schema['tables'].get('G01', {}).get('source') != g01_fingerprint or not postcodes_file.exists():
+        with open(table_file('G01'), 'r') as f:
+            postcodes = [strip_poa(row['POA_CODE_2021']) for row in csv.DictReader(f)]
+        for path in store_dir.iterdir():
+            if path.is_dir():
+                shutil.rmtree(path)
+        if len(set(postcodes)) != len(postcodes):
+            raise ValueError(f"Duplicate postal areas in {table_file('G01')}")
+        # dtype=str sizes the array to the longest code, so nothing is truncated
+        np.save(postcodes_file, np.array(postcodes, dtype=str))
+        schema = {'tables': {}, 'columns': {}}
+    else:
+        postcodes = np.load(postcodes_file).tolist()
+    row_index = {postcode: i for i, postcode in enumerate(postcodes)}
+
+    # Drop tables that are no longer selected
+    for table in list(schema['tables']):
+        if table not in tables:
+            print(f"Removing {table}")
+            shutil.rmtree(store_dir / table, ignore_errors=True)
+            del schema['tables'][table]
+            schema['columns'] = {name: dtype for name, dtype in schema['columns'].items()
+                                 if not name.startswith(f"{table}.")}
+
+    for table in tables:
+        source = fingerprint(table_file(table))
+        if schema['tables'].get(table, {}).get('source') == source:
+            print(f"{table} unchanged, skipping")
+            continue
+
+        dtypes = ingest_table(table, row_index)
+        schema['columns'] = {name: dtype for name, dtype in schema['columns'].items()
+                             if not name.startswith(f"{table}.")}
+        schema['columns'].update(dtypes)
+        schema['tables'][table] = {'source': source, 'columns': len(dtypes)}
+        print(f"Ingested {table}: {len(dtypes)} columns")
+
+    with open(schema_file, 'w') as f:
+        json.dump(schema, f, indent=2)
+
+    print(f"Census store with {len(postcodes)} postcodes and {len(schema['columns'])} columns written to {store_dir}")
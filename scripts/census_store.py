@@ -0,0 +1,45 @@
+"""Read-only access to the census feature store built by build_census_store.py.
+
+Columns are named '<table>.<column>', e.g. 'G01.Tot_P_P', and come back as
+memory-mapped numpy arrays aligned with the store's postcode array, so only the
+pages that are actually touched get read from disk.
+"""
+import json
+from pathlib import Path
+
+import numpy as np
+
+# Get the project root directory (parent of scripts/)
+project_root = Path(__file__).parent.parent
+
+store_dir = project_root / 'data/processed/census_store'
+schema_file = store_dir / 'schema.json'
+postcodes_file = store_dir / 'postcodes.npy'
+
+
+def column_file(name):
+    """Path of the .npy file backing a '<table>.<column>' name."""
+    table, column = name.split('.', 1)
+    return store_dir / table / f"{column}.npy"
+
+
+def load_schema():
+    """Return the store schema: {'tables': {...}, 'columns': {name: dtype}}."""
+    if not schema_file.exists():
+        raise FileNotFoundError(f"No census store at {store_dir}. Run scripts/build_census_store.py first.")
+    with open(schema_file, 'r') as f:
+        return json.load(f)
+
+
+def load_postcodes():
+    """Postcodes ('2000', '2007', ...) in store row order."""
+    return np.load(postcodes_file, mmap_mode='r')
+
+
+def load_columns(names):
+    """Return {name: memory-mapped array} for the requested '<table>.<column>' names."""
+    available = load_schema()['columns']
+    missing = [name for name in names if name not in available]
+    if missing:
+        raise KeyError(f"Columns not in census store: {', '.join(missing)}")
+    return {name: np.load(column_file(name), mmap_mode='r') for name in names}
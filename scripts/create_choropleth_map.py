@@ -4,6 +4,7 @@ import geopandas as gpd
 import folium
 import json
 from pathlib import Path
+from html_templates import check_budget, minify_html
 
 # Get the project root directory (parent of scripts/)
 project_root = Path(__file__).parent.parent
@@ -95,38 +96,16 @@ choropleth = folium.Choropleth(
     nan_fill_opacity=0.2
 ).add_to(m)
 
-# Add tooltips with detailed information
-style_function = lambda x: {
-    'fillColor': '#ffffff',
-    'color': '#000000',
-    'fillOpacity': 0.1,
-    'weight': 0.1
-}
-
-highlight_function = lambda x: {
-    'fillColor': '#000000',
-    'color': '#000000',
-    'fillOpacity': 0.3,
-    'weight': 2
-}
-
-# Create a custom tooltip/popup for each postcode
-tooltip = folium.features.GeoJsonTooltip(
+# Add tooltips with detailed information to the choropleth layer itself,
+# so the boundaries are only embedded once. GeoJsonTooltip renders every
+# postcode from one client-side template.
+folium.features.GeoJsonTooltip(
     fields=['POA_CODE21', 'population', 'firearms', 'firearms_rate'],
     aliases=['Postcode:', 'Population:', 'Firearms:', 'Per 1000:'],
     style=("background-color: white; color: #333333; font-family: arial; "
            "font-size: 12px; padding: 10px;"),
     localize=True
-)
-
-# Add the GeoJson with tooltips
-folium.GeoJson(
-    nsw_geojson,
-    style_function=style_function,
-    highlight_function=highlight_function,
-    tooltip=tooltip,
-    name='Postcode Details'
-).add_to(m)
+).add_to(choropleth.geojson)
 
 # Add alternative tile layers
 folium.TileLayer('OpenStreetMap').add_to(m)
@@ -147,9 +126,14 @@ title_html = '''
 '''
 m.get_root().html.add_child(folium.Element(title_html))
 
+# Render and minify, then fail the build if the page is over budget
+html_content = minify_html(m.get_root().render())
+check_budget('nsw_firearms_choropleth.html', html_content)
+
 # Save the map
 output_file = project_root / 'output/nsw_firearms_choropleth.html'
-m.save(output_file)
+with open(output_file, 'w') as f:
+    f.write(html_content)
 
 print(f"\nChoropleth map saved to {output_file}")
 print("Open this file in a web browser to view the interactive map!")
@@ -4,6 +4,7 @@ import folium
 from folium.plugins import HeatMap
 import pgeocode
 from pathlib import Path
+from html_templates import check_budget, minify_html
 
 # Get the project root directory (parent of scripts/)
 project_root = Path(__file__).parent.parent
@@ -81,32 +82,45 @@ def get_color(rate):
     else:
         return '#ff0000'  # Red
 
-# Add circles for each postcode
-for loc in locations:
-    color = get_color(loc['rate'])
-
-    # Create popup text
-    popup_text = f"""
-    <div style="font-family: Arial; min-width: 200px;">
-        <h4>Postcode {loc['postcode']}</h4>
-        <table style="width:100%">
-            <tr><td><b>Population:</b></td><td>{loc['population']}</td></tr>
-            <tr><td><b>Firearms:</b></td><td>{loc['firearms']}</td></tr>
-            <tr><td><b>Per 1000:</b></td><td>{loc['rate']:.2f}</td></tr>
-        </table>
-    </div>
-    """
-
-    folium.CircleMarker(
-        location=[loc['lat'], loc['lon']],
-        radius=8,
-        popup=folium.Popup(popup_text, max_width=300),
-        tooltip=f"Postcode {loc['postcode']}: {loc['rate']:.2f} per 1000",
-        color=color,
-        fillColor=color,
-        fillOpacity=0.7,
-        weight=2
-    ).add_to(m)
+# Add circles for each postcode as one GeoJSON layer. The popup and tooltip are
+# single client-side templates filled from each point's properties, instead of
+# a copy of the popup HTML per marker.
+points = {
+    'type': 'FeatureCollection',
+    'features': [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [loc['lon'], loc['lat']]},
+            'properties': {
+                'postcode': loc['postcode'],
+                'population': loc['population'],
+                'firearms': loc['firearms'],
+                'rate': round(loc['rate'], 2),
+                'color': get_color(loc['rate'])
+            }
+        }
+        for loc in locations
+    ]
+}
+
+folium.GeoJson(
+    points,
+    name='Postcodes',
+    marker=folium.CircleMarker(radius=8, fill=True, fillOpacity=0.7, weight=2),
+    style_function=lambda feature: {
+        'color': feature['properties']['color'],
+        'fillColor': feature['properties']['color']
+    },
+    popup=folium.GeoJsonPopup(
+        fields=['postcode', 'population', 'firearms', 'rate'],
+        aliases=['Postcode:', 'Population:', 'Firearms:', 'Per 1000:'],
+        style="font-family: Arial; min-width: 200px;"
+    ),
+    tooltip=folium.GeoJsonTooltip(
+        fields=['postcode', 'rate'],
+        aliases=['Postcode', 'Per 1000']
+    )
+).add_to(m)
 
 # Add a custom legend
 legend_html = f'''
@@ -142,8 +156,13 @@ m.get_root().html.add_child(folium.Element(legend_html))
 # Add layer control
 folium.LayerControl().add_to(m)
 
+# Render and minify, then fail the build if the page is over budget
+html_content = minify_html(m.get_root().render())
+check_budget('nsw_firearms_heatmap.html', html_content)
+
 # Save the map
 output_file = project_root / 'output/nsw_firearms_heatmap.html'
-m.save(output_file)
+with open(output_file, 'w') as f:
+    f.write(html_content)
 print(f"\nMap saved to {output_file}")
 print("Open this file in a web browser to view the interactive map!")
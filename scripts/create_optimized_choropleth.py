@@ -4,6 +4,7 @@ import geopandas as gpd
 import folium
 import json
 from pathlib import Path
+from html_templates import check_budget, minify_html
 
 # Get the project root directory
 project_root = Path(__file__).parent.parent
@@ -57,7 +58,7 @@ m = folium.Map(
 nsw_geojson = json.loads(nsw_gdf[['POA_CODE21', 'firearms_rate', 'population', 'firearms', 'geometry']].to_json())
 
 # Create choropleth
-folium.Choropleth(
+choropleth = folium.Choropleth(
     geo_data=nsw_geojson,
     name='Firearms per 1000 people',
     data=nsw_gdf,
@@ -68,22 +69,17 @@ folium.Choropleth(
     line_opacity=0.2,
     line_weight=1,
     legend_name='Firearms per 1000 People',
+    highlight=True,
     nan_fill_color='lightgray'
 ).add_to(m)
 
-# Add tooltips
-tooltip = folium.features.GeoJsonTooltip(
+# Add tooltips to the choropleth's own layer rather than a second copy of the geometries.
+# GeoJsonTooltip is one client-side template filled from each feature's properties.
+folium.features.GeoJsonTooltip(
     fields=['POA_CODE21', 'population', 'firearms', 'firearms_rate'],
     aliases=['Postcode:', 'Population:', 'Firearms:', 'Per 1000:'],
     style="background-color: white; color: #333; font-family: arial; font-size: 12px; padding: 10px;"
-)
-
-folium.GeoJson(
-    nsw_geojson,
-    style_function=lambda x: {'fillColor': '#ffffff', 'color': '#000000', 'fillOpacity': 0.1, 'weight': 0.1},
-    highlight_function=lambda x: {'fillColor': '#000000', 'color': '#000000', 'fillOpacity': 0.3, 'weight': 2},
-    tooltip=tooltip
-).add_to(m)
+).add_to(choropleth.geojson)
 
 # Add title
 title_html = '''
@@ -96,17 +92,16 @@ title_html = '''
 '''
 m.get_root().html.add_child(folium.Element(title_html))
 
-# Save the map
-output_file = project_root / 'map.html'
-m.save(output_file)
+# Render and minify, then fail the build if the page is over budget
+html_content = minify_html(m.get_root().render())
+check_budget('map_inline.html', html_content)
 
-# Check file size
-import os
-file_size_mb = os.path.getsize(output_file) / (1024 * 1024)
+# Save the map. The geometry is embedded in the page, so it gets its own name and
+# budget rather than replacing the lightweight map.html from create_github_pages_map.py
+output_file = project_root / 'map_inline.html'
+with open(output_file, 'w') as f:
+    f.write(html_content)
+
+file_size_mb = len(html_content.encode()) / (1024 * 1024)
 print(f"\nOptimized map saved to {output_file}")
 print(f"File size: {file_size_mb:.2f} MB")
-
-if file_size_mb > 90:
-    print("⚠️  Warning: File is still quite large. May need further optimization.")
-else:
-    print("✓ File size is acceptable for GitHub Pages")
@@ -0,0 +1,226 @@
+"""Shared HTML templating, minification and byte budgets for the map builders.
+
+Templates use {{ name }} placeholders, so CSS/JS braces (and JS ${...}
+template literals) can be written as-is instead of doubled inside an f-string.
+Every generated file goes through check_budget() before it is written; an
+oversized file fails the build with a per-component breakdown of the bytes.
+"""
+import re
+from collections import defaultdict
+
+# GitHub warns on files over 50 MB and rejects them over 100 MB
+github_pages_budget = 90 * 1024 * 1024
+
+# Byte budget for each generated file, keyed by file name. Every builder checks its
+# output against this table, so a file has the same budget whichever script wrote it.
+budgets = {
+    'map.html': 32 * 1024,                            # Leaflet shell; geometry lives in data.topojson
+    'data.topojson': github_pages_budget,
+    'map_inline.html': github_pages_budget,           # folium page with the geometry embedded
+    'nsw_firearms_choropleth.html': github_pages_budget,
+    'nsw_firearms_heatmap.html': github_pages_budget,
+}
+
+_placeholder = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+_open_block = re.compile(r'<(script|style)\b[^>]*>', re.I)
+_close_block = {tag: re.compile(rf'</{tag}\s*>', re.I) for tag in ('script', 'style')}
+_js_declaration = re.compile(r'^[ \t]*(?:var|let|const|function)\s+([A-Za-z_$][\w$]*)', re.M)
+# Complete single-line ' and " strings, removed before the fast path counts brackets
+_js_string = re.compile(r'"(?:[^"\\\n]|\\.)*"|\'(?:[^\'\\\n]|\\.)*\'')
+# Anything left after removing those strings that needs the character-by-character scan
+_js_tricky = ('`', "'", '"', '\\', '//', '/*')
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def render(template, **values):
+    """Fill {{ name }} placeholders. A placeholder without a value is an error."""
+    def substitute(match):
+        name = match.group(1)
+        if name not in values:
+            raise KeyError(f"No value for template placeholder '{name}'")
+        return str(values[name])
+    return _placeholder.sub(substitute, template)
+
+
+def minify_css(css):
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    return re.sub(r'\s*([{};:,>])\s*', r'\1', css).replace(';}', '}').strip()
+
+
+def _scan_js_line(line, depth, quote):
+    """Return (depth, quote) after one line of JS, character by character."""
+    i = 0
+    n = len(line)
+    while i < n:
+        char = line[i]
+        if quote == '/*':
+            if line.startswith('*/', i):
+                quote = None
+                i += 1
+        elif quote:
+            if char == '\\':
+                i += 1
+                if i >= n:
+                    # An escaped newline continues the string onto the next line
+                    return depth, quote
+            elif char == quote:
+                quote = None
+        elif line.startswith('//', i):
+            break
+        elif line.startswith('/*', i):
+            quote = '/*'
+            i += 1
+        elif char in '\'"`':
+            quote = char
+        elif char in '{([':
+            depth += 1
+        elif char in '})]':
+            depth -= 1
+        i += 1
+    if quote in ('\'', '"'):
+        # An unescaped newline ends a ' or " string
+        quote = None
+    return depth, quote
+
+
+def _js_line_states(js):
+    """Yield (depth, quote) at the start of each line of js, one per js.split('\\n') line.
+
+    depth counts open braces/brackets/parens outside strings and comments. quote is
+    the string delimiter still open at the start of the line ('`' for a multi-line
+    template literal, or '\\'/'"' after a backslash continuation), '/*' inside a
+    block comment, or None.
+
+    Most lines, including folium's long single-line GeoJSON payloads, have no
+    comments, template literals or escapes once their plain strings are removed,
+    so their brackets are counted with str.count instead of a Python loop.
+    """
+    depth = 0
+    quote = None
+    for line in js.split('\n'):
+        yield depth, quote
+        if not quote:
+            code = _js_string.sub('', line)
+            if not any(token in code for token in _js_tricky):
+                depth += (code.count('{') + code.count('(') + code.count('[')
+                          - code.count('}') - code.count(')') - code.count(']'))
+                continue
+        depth, quote = _scan_js_line(line, depth, quote)
+
+
+def minify_js(js):
+    """Strip indentation, blank lines and whole-line // comments.
+
+    Lines inside multi-line string or template literals are left untouched, and
+    line breaks are kept so automatic semicolon insertion still works.
+    """
+    lines = js.split('\n')
+    states = [quote for _, quote in _js_line_states(js)]
+    kept = []
+    for line, quote, next_quote in zip(lines, states, states[1:] + [None]):
+        if quote and quote != '/*':
+            kept.append(line)
+            continue
+        # Trailing whitespace is part of the literal if one opens on this line
+        line = line.lstrip() if next_quote and next_quote != '/*' else line.strip()
+        if line and not line.startswith('//'):
+            kept.append(line)
+    return '\n'.join(kept)
+
+
+def _blocks(html):
+    """Yield (start, end, open_tag, tag, body, close_tag) for each inline <script>/<style> block.
+
+    The closing tag is found with a literal search rather than a lazy .*? regex,
+    which is slow across multi-megabyte GeoJSON payloads.
+    """
+    position = 0
+    while True:
+        opening = _open_block.search(html, position)
+        if not opening:
+            return
+        tag = opening.group(1).lower()
+        closing = _close_block[tag].search(html, opening.end())
+        if not closing:
+            return
+        yield (opening.start(), closing.end(), opening.group(0), tag,
+               html[opening.end():closing.start()], closing.group(0))
+        position = closing.end()
+
+
+def minify_html(html):
+    """Minify inline <style>/<script> blocks and drop whitespace between tags."""
+    parts = []
+    position = 0
+    for start, end, open_tag, tag, body, close_tag in _blocks(html):
+        # Markup between blocks always sits between two tags, so its edges can be stripped too
+        parts.append(re.sub(r'>\s+<', '><', html[position:start]).strip())
+        body = minify_css(body) if tag == 'style' else minify_js(body)
+        parts.append(open_tag + body + close_tag)
+        position = end
+    parts.append(re.sub(r'>\s+<', '><', html[position:]).strip())
+    return ''.join(parts)
+
+
+def _top_level_lines(body):
+    """Yield the offsets of line starts that sit outside any brace, bracket, string or comment."""
+    offset = 0
+    for line, (depth, quote) in zip(body.split('\n'), _js_line_states(body)):
+        if depth == 0 and not quote:
+            yield offset
+        offset += len(line) + 1
+
+
+def _script_components(body):
+    """Split an inline script at each line-level declaration and size the pieces.
+
+    folium puts the whole map into one <script>, so this is what separates the
+    embedded GeoJSON from the tooltip/popup code. Names lose folium's random id suffix.
+    """
+    top_level = set(_top_level_lines(body))
+    starts = [(match.start(), re.sub(r'_[0-9a-f]{32}', '', match.group(1)))
+              for match in _js_declaration.finditer(body) if match.start() in top_level]
+    if not starts or starts[0][0] > 0:
+        starts.insert(0, (0, None))
+    for (start, name), (end, _) in zip(starts, starts[1:] + [(len(body), None)]):
+        yield ('script: ' + name if name else 'script'), len(body[start:end].encode())
+
+
+def breakdown(html):
+    """Bytes used by each inline style/script component and the remaining markup, largest first."""
+    sizes = defaultdict(int)
+    markup = len(html.encode())
+    for _, _, _, tag, body, _ in _blocks(html):
+        if not body.strip():
+            continue
+        if tag == 'style':
+            sizes['style'] += len(body.encode())
+        else:
+            for label, size in _script_components(body):
+                sizes[label] += size
+        markup -= len(body.encode())
+    sizes['markup'] += markup
+    return sorted(sizes.items(), key=lambda item: item[1], reverse=True)
+
+
+def check_budget(name, content, components=None):
+    """Raise BudgetExceeded if content is over the budget for the file name in budgets.
+
+    components is a list of (label, bytes); for HTML it defaults to breakdown(content).
+    """
+    budget = budgets[name]
+    size = len(content.encode()) if isinstance(content, str) else len(content)
+    if size <= budget:
+        print(f"✓ {name}: {size / 1024:.1f} KB of {budget / 1024:.1f} KB budget")
+        return size
+
+    if components is None:
+        components = breakdown(content) if isinstance(content, str) else [(name, size)]
+    lines = [f"{name} is {size:,} bytes, over its {budget:,} byte budget:"]
+    for label, component_size in components:
+        lines.append(f"  {component_size:>14,}  {component_size / size:6.1%}  {label}")
+    raise BudgetExceeded('\n'.join(lines))
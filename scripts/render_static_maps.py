@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+import csv
+import hashlib
+import json
+import math
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+# Get the project root directory (parent of scripts/)
+project_root = Path(__file__).parent.parent
+
+shapefile = project_root / 'data/raw/poa_2021/POA_2021_AUST_GDA2020.shp'
+geometry_cache = project_root / 'data/processed/nsw_postcode_geometries.pkl'
+output_dir = project_root / 'output/static'
+manifest_file = output_dir / 'manifest.json'
+
+# Each release is one combined population/firearms CSV. Add a line here when a
+# new licensing snapshot is published.
+releases = {
+    'jun25': project_root / 'data/processed/postcode_population_firearms.csv',
+}
+
+# Output widths in pixels. SVG is size independent, so it is rendered once per variant.
+sizes = {
+    'thumb': 320,
+    'medium': 1200,
+    'print': 3600,
+}
+
+# Same 8-class YlOrRd scheme as map.html (create_github_pages_map.py)
+class_breaks = [0.8, 0.6, 0.4, 0.2, 0.1, 0.05, 0.02]
+class_colors = ['#800026', '#BD0026', '#E31A1C', '#FC4E2A', '#FD8D3C', '#FEB24C', '#FED976', '#FFEDA0']
+nan_color = '#D3D3D3'
+
+# Geometries are simplified once when the cache is built (tolerance in degrees, ~200m).
+# It is stored in the cache, and the cache is rebuilt when this changes.
+simplify_tolerance = 0.002
+
+# Everything render_job does besides the per-job inputs. These are part of each image's
+# hash, so changing any of them re-renders everything. Bump 'version' when the drawing
+# code itself changes (e.g. the latitude aspect stretch).
+render_settings = {
+    'version': 1,
+    'dpi': 100,
+    'edgecolor': 'white',
+    'linewidth_per_px': 1 / 6000,
+    'min_linewidth': 0.05,
+    'legend_loc': 'lower right',
+    'legend_fontsize': 'small',
+    'svg_width': sizes['medium'],
+    # Fixed salt for matplotlib's SVG element ids, which are otherwise random
+    'svg_hashsalt': 'nsw-firearms',
+}
+
+
+def build_geometry_cache():
+    """Reproject and simplify the NSW postcode boundaries, and pickle the rings for the renderers."""
+    import geopandas as gpd
+    from shapely.geometry.polygon import orient
+
+    print("Loading postcode boundary data...")
+    gdf = gpd.read_file(shapefile)
+    gdf = gdf.to_crs(epsg=4326)
+
+    gdf['POA_CODE21'] = gdf['POA_CODE21'].astype(str)
+    nsw_gdf = gdf[gdf['POA_CODE21'].str.startswith('2') & gdf['geometry'].notna()].copy()
+    nsw_gdf['geometry'] = nsw_gdf['geometry'].simplify(tolerance=simplify_tolerance, preserve_topology=True)
+
+    postcodes = []
+    rings = []
+    for postcode, geometry in zip(nsw_gdf['POA_CODE21'], nsw_gdf['geometry']):
+        polygons = geometry.geoms if geometry.geom_type == 'MultiPolygon' else [geometry]
+        postcode_rings = []
+        for polygon in polygons:
+            # Exterior counter-clockwise and holes clockwise, so holes stay empty when filled
+            polygon = orient(polygon, sign=1.0)
+            postcode_rings.append(list(polygon.exterior.coords))
+            postcode_rings.extend(list(interior.coords) for interior in polygon.interiors)
+        postcodes.append(postcode)
+        rings.append(postcode_rings)
+
+    cache = {
+        'simplify_tolerance': simplify_tolerance,
+        'postcodes': postcodes,
+        'rings': rings,
+        'bounds': tuple(nsw_gdf.total_bounds),
+    }
+    with open(geometry_cache, 'wb') as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    print(f"Cached {len(postcodes)} postcode geometries to {geometry_cache}")
+
+
+def load_release(csv_file):
+    """Read a combined population/firearms CSV into {postcode: (population, firearms)}."""
+    data = {}
+    with open(csv_file, 'r') as f:
+        reader = csv.DictReader(f)
+        for row in reader:
+            try:
+                data[row['POSTCODE']] = (int(row['POPULATION']), int(row['FIREARMS']))
+            except ValueError:
+                continue
+    return data
+
+
+def compute_rates(data, smoothed):
+    """Firearms per 1000 people for each postcode with population.
+
+    The smoothed rate shrinks each postcode towards the NSW-wide rate, weighted by
+    the median postcode population, so tiny postcodes don't dominate the colour scale.
+    """
+    populated = {postcode: values for postcode, values in data.items() if values[0] > 0}
+    if not smoothed:
+        return {postcode: firearms / population * 1000 for postcode, (population, firearms) in populated.items()}
+
+    total_population = sum(population for population, _ in populated.values())
+    total_firearms = sum(firearms for _, firearms in populated.values())
+    state_rate = total_firearms / total_population
+    populations = sorted(population for population, _ in populated.values())
+    prior_weight = populations[len(populations) // 2]
+
+    return {
+        postcode: (firearms + prior_weight * state_rate) / (population + prior_weight) * 1000
+        for postcode, (population, firearms) in populated.items()
+    }
+
+
+def get_color(rate, min_rate, max_rate):
+    """Returns the class colour for a rate, matching getColor() in map.html"""
+    if rate is None:
+        return nan_color
+    normalized = (rate - min_rate) / (max_rate - min_rate) if max_rate != min_rate else 0
+    for threshold, color in zip(class_breaks, class_colors):
+        if normalized > threshold:
+            return color
+    return class_colors[-1]
+
+
+# Per-process state, filled in once by init_worker so each job doesn't reload the cache
+_worker_paths = None
+_worker_bounds = None
+
+
+def init_worker(cache_file):
+    """Load the cached geometries once per worker process and build matplotlib paths."""
+    global _worker_paths, _worker_bounds
+    from matplotlib.path import Path as MplPath
+
+    with open(cache_file, 'rb') as f:
+        cache = pickle.load(f)
+
+    _worker_paths = [
+        MplPath.make_compound_path(*[MplPath(ring, closed=True) for ring in postcode_rings])
+        for postcode_rings in cache['rings']
+    ]
+    _worker_bounds = cache['bounds']
+
+
+def render_job(job):
+    """Draw one choropleth image. Runs in a worker process."""
+    import matplotlib
+    matplotlib.use('Agg')
+    matplotlib.rcParams['svg.hashsalt'] = render_settings['svg_hashsalt']
+    import matplotlib.pyplot as plt
+    from matplotlib.collections import PathCollection
+    from matplotlib.patches import Patch
+
+    min_x, min_y, max_x, max_y = _worker_bounds
+    # Stretch latitude so NSW doesn't look squashed in plain lon/lat
+    aspect = 1 / math.cos(math.radians((min_y + max_y) / 2))
+    dpi = render_settings['dpi']
+    width = job['width'] / dpi
+    height = width * (max_y - min_y) * aspect / (max_x - min_x)
+
+    fig = plt.figure(figsize=(width, height), dpi=dpi)
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.set_axis_off()
+
+    collection = PathCollection(
+        _worker_paths,
+        facecolors=job['colors'],
+        edgecolors=render_settings['edgecolor'],
+        linewidths=max(render_settings['min_linewidth'], job['width'] * render_settings['linewidth_per_px']),
+    )
+    ax.add_collection(collection)
+    ax.set_xlim(min_x, max_x)
+    ax.set_ylim(min_y, max_y)
+    ax.set_aspect(aspect)
+
+    if job['legend']:
+        handles = [Patch(facecolor=color, label=label) for color, label in job['legend']]
+        ax.legend(handles=handles, title=job['title'], loc=render_settings['legend_loc'],
+                  fontsize=render_settings['legend_fontsize'], frameon=True)
+
+    # Drop the timestamp/version metadata (and salt SVG ids, above) so unchanged inputs
+    # give byte-identical files
+    metadata = {'Software': None} if job['format'] == 'png' else {'Date': None}
+    fig.savefig(job['output'], dpi=dpi, format=job['format'], metadata=metadata)
+    plt.close(fig)
+    return job['output']
+
+
+def build_jobs(cache_digest, postcodes):
+    """One job per release, variant and size, each tagged with a hash of everything it depends on."""
+    jobs = []
+    for release, csv_file in releases.items():
+        data = load_release(csv_file)
+        for variant in ['rate', 'smoothed']:
+            rates = compute_rates(data, smoothed=(variant == 'smoothed'))
+            nsw_rates = [rate for postcode, rate in rates.items() if postcode.startswith('2')]
+            min_rate = min(nsw_rates)
+            max_rate = max(nsw_rates)
+
+            colors = [get_color(rates.get(postcode), min_rate, max_rate) for postcode in postcodes]
+            grades = [min_rate + g * (max_rate - min_rate) for g in [0, 0.02, 0.05, 0.1, 0.2, 0.4, 0.6, 0.8]]
+            # Grades run from the lowest class up, so the swatches are class_colors reversed
+            legend = []
+            for i, (grade, color) in enumerate(zip(grades, reversed(class_colors))):
+                label = f"{grade:.0f}–{grades[i + 1]:.0f}" if i + 1 < len(grades) else f"{grade:.0f}+"
+                legend.append((color, label))
+            title = 'Firearms per 1000' + (' (smoothed)' if variant == 'smoothed' else '')
+
+            targets = [(size, width, 'png') for size, width in sizes.items()]
+            targets.append(('vector', render_settings['svg_width'], 'svg'))
+            for size, width, fmt in targets:
+                job = {
+                    'output': str(output_dir / f"nsw_firearms_{release}_{variant}_{size}.{fmt}"),
+                    'format': fmt,
+                    'width': width,
+                    'colors': colors,
+                    # Thumbnails are too small for a readable legend
+                    'legend': legend if size != 'thumb' else None,
+                    'title': title,
+                }
+                payload = json.dumps({'job': job, 'render_settings': render_settings}, sort_keys=True)
+                job['hash'] = hashlib.sha256((cache_digest + payload).encode()).hexdigest()
+                jobs.append(job)
+    return jobs
+
+
+if __name__ == '__main__':
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Rebuild the reprojected geometries only when the cache is missing, was built with a
+    # different simplify_tolerance, or the shapefile is newer. The shapefile isn't needed
+    # at all once an up-to-date cache exists.
+    stale_reason = None
+    if not geometry_cache.exists():
+        stale_reason = 'missing'
+    else:
+        with open(geometry_cache, 'rb') as f:
+            cached_tolerance = pickle.load(f).get('simplify_tolerance')
+        if cached_tolerance != simplify_tolerance:
+            stale_reason = f"built with simplify_tolerance={cached_tolerance}"
+        elif shapefile.exists() and geometry_cache.stat().st_mtime < shapefile.stat().st_mtime:
+            stale_reason = 'older than the shapefile'
+
+    if stale_reason and not shapefile.exists():
+        raise FileNotFoundError(
+            f"Geometry cache {geometry_cache} is {stale_reason} and {shapefile} doesn't exist; "
+            "download the ABS POA boundaries first."
+        )
+    if stale_reason:
+        print(f"Geometry cache is {stale_reason}, rebuilding...")
+        build_geometry_cache()
+    else:
+        print(f"Using cached geometries from {geometry_cache}")
+
+    with open(geometry_cache, 'rb') as f:
+        cache_bytes = f.read()
+    cache_digest = hashlib.sha256(cache_bytes).hexdigest()
+    postcodes = pickle.loads(cache_bytes)['postcodes']
+    del cache_bytes
+
+    manifest = {}
+    if manifest_file.exists():
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+
+    jobs = build_jobs(cache_digest, postcodes)
+    pending = [
+        job for job in jobs
+        if manifest.get(Path(job['output']).name) != job['hash'] or not os.path.exists(job['output'])
+    ]
+    print(f"{len(jobs)} images, {len(jobs) - len(pending)} unchanged, rendering {len(pending)}...")
+
+    if pending:
+        # Record each hash as its image finishes, and save the manifest even if a render fails,
+        # so a rerun only redoes the images that didn't make it
+        try:
+            with ProcessPoolExecutor(initializer=init_worker, initargs=(str(geometry_cache),)) as pool:
+                futures = {pool.submit(render_job, job): job for job in pending}
+                for future in as_completed(futures):
+                    output = future.result()
+                    manifest[Path(output).name] = futures[future]['hash']
+                    print(f"  Rendered {output}")
+        finally:
+            with open(manifest_file, 'w') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+
+    print(f"\nStatic maps saved to {output_dir}")